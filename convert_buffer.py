@@ -0,0 +1,36 @@
+import os
+import argparse
+
+import torch
+from tqdm import tqdm
+
+from utils import load_buffer, flatten_trajectory
+
+
+def main(args):
+    n = 0
+    while os.path.exists(os.path.join(args.expert_dir, "replay_buffer_{}.pt".format(n))):
+        src = os.path.join(args.expert_dir, "replay_buffer_{}.pt".format(n))
+        dst = os.path.join(args.expert_dir, "replay_buffer_{}.bf16.pt".format(n))
+        print("Converting {} -> {}".format(src, dst))
+        # each expert becomes one flat [epochs, num_params] bf16 tensor
+        buffer = [
+            flatten_trajectory(trajectory).to(torch.bfloat16)
+            for trajectory in tqdm(load_buffer(src))
+        ]
+        torch.save(buffer, dst)
+        n += 1
+    if n == 0:
+        raise AssertionError("No buffers detected at {}".format(args.expert_dir))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parameter Processing')
+    parser.add_argument(
+        '--expert_dir',
+        type=str,
+        required=True,
+        help='directory holding the replay_buffer_*.pt files to convert to bf16',
+    )
+    args = parser.parse_args()
+    main(args)
@@ -10,7 +10,7 @@ import torch
 import torch.nn as nn
 from torchvision.utils import save_image
 
-from utils_DC import get_loops, get_dataset, get_network, get_eval_pool, evaluate_synset, get_daparam, match_loss, get_time, TensorDataset, epoch, DiffAugment, ParamDiffAug
+from utils_DC import get_loops, get_dataset, get_network, get_eval_pool, evaluate_synset, get_daparam, match_loss, get_time, TensorDataset, epoch, DiffAugment, ParamDiffAug, get_class_indices
 
 
 def main():
@@ -79,16 +79,11 @@ def main():
         print('Evaluation model pool: ', model_eval_pool)
 
         ''' organize the real dataset '''
-        images_all = []
-        labels_all = []
-        indices_class = [[] for c in range(num_classes)]
-
         images_all = [torch.unsqueeze(dst_train[i][0], dim=0) for i in range(len(dst_train))]
         labels_all = [dst_train[i][1] for i in range(len(dst_train))]
-        for i, lab in enumerate(labels_all):
-            indices_class[lab].append(i)
         images_all = torch.cat(images_all, dim=0).to(args.device)
         labels_all = torch.tensor(labels_all, dtype=torch.long, device=args.device)
+        indices_class = get_class_indices(labels_all, num_classes)
 
 
 
@@ -96,7 +91,7 @@ def main():
             print('class c = %d: %d real images'%(c, len(indices_class[c])))
 
         def get_images(c, n): # get random n images from class c
-            idx_shuffle = np.random.permutation(indices_class[c])[:n]
+            idx_shuffle = indices_class[c][torch.randperm(len(indices_class[c]), device=images_all.device)[:n]]
             return images_all[idx_shuffle]
 
         for ch in range(channel):
@@ -3,12 +3,14 @@
 
 import os
 import sys
+import inspect
 import argparse
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import torch
 import torch.nn as nn
+import torch.distributed as dist
 import torch.nn.functional as F
 import torchvision.utils
 from tqdm import tqdm
@@ -20,18 +22,61 @@ from utils import (
     get_time,
     DiffAugment,
     ParamDiffAug,
+    get_class_indices,
+    load_buffer,
+    flatten_trajectory,
     seed_torch
 )
 
-import copy
 import random
+from concurrent.futures import ThreadPoolExecutor
 from reparam_module import ReparamModule
 
+try:
+    from torch.func import grad as func_grad
+except ImportError:  # PyTorch < 2.0
+    func_grad = None
+
 import warnings
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
 
+def compute_grand_loss(student_last, target_params, param_dist, num_params):
+    # normalised trajectory-matching loss written as plain elementwise ops + sums,
+    # so torch.compile can fuse it into a single pass over the flat parameters
+    param_loss = ((student_last - target_params) ** 2).sum() / num_params
+    return param_loss / (param_dist / num_params)
+
+
+class _SumAcrossRanks(torch.autograd.Function):
+    # sums the ranks' partial inner-step gradients; the result, and hence the gradient
+    # flowing back into it, is identical on every rank, so backward passes it through
+    @staticmethod
+    def forward(ctx, x):
+        x = x.clone()
+        dist.all_reduce(x)
+        return x
+
+    @staticmethod
+    def backward(ctx, grad):
+        return grad
+
+
+class _SharedAcrossRanks(torch.autograd.Function):
+    # marks student parameters held identically by every rank; backward sums what each
+    # rank's slice of the batch contributed to their gradient
+    @staticmethod
+    def forward(ctx, x):
+        return x
+
+    @staticmethod
+    def backward(ctx, grad):
+        grad = grad.clone()
+        dist.all_reduce(grad)
+        return grad
+
+
 def main(args):
     os.environ["CUDA_VISIBLE_DEVICES"] = args.CUDA_VISIBLE_DEVICES
     seed_torch()
@@ -43,6 +88,25 @@ def main(args):
 
     args.dsa = True if args.dsa == 'True' else False
     args.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    args.bf16_autocast = args.bf16_autocast and torch.cuda.is_available()
+
+    # launched by torchrun: one process per GPU, all matching the same expert trajectory
+    # with each step's synthetic batch split across them
+    args.distributed = int(os.environ.get("WORLD_SIZE", 1)) > 1
+    if args.distributed:
+        # rank 0 evaluates on its own while the others wait in the next collective,
+        # so the timeout has to cover a whole evaluation round
+        dist.init_process_group(
+            "nccl", timeout=timedelta(minutes=args.dist_timeout)
+        )
+        args.rank = dist.get_rank()
+        args.world_size = dist.get_world_size()
+        local_rank = int(os.environ["LOCAL_RANK"])
+        torch.cuda.set_device(local_rank)
+        args.device = 'cuda:{}'.format(local_rank)
+    else:
+        args.rank = 0
+        args.world_size = 1
     
     now = datetime.now()
     current_time = now.strftime("%m-%d-%Y-%H:%M:%S")
@@ -87,45 +151,56 @@ def main(args):
     if args.batch_syn is None:
         args.batch_syn = num_classes * args.ipc
 
-    args.distributed = torch.cuda.device_count() > 1
-
     print('Evaluation model pool: ', model_eval_pool)
 
     ''' organize the real dataset '''
-    images_all = []
-    labels_all = []
-    indices_class = [[] for c in range(num_classes)]
+    # dense lookup table so labels can be remapped batch-wise instead of per sample
+    class_map_tensor = torch.full((max(class_map) + 1,), -1, dtype=torch.long)
+    class_map_tensor[list(class_map.keys())] = torch.tensor(
+        list(class_map.values()), dtype=torch.long
+    )
 
     print("BUILDING DATASET")
-    for i in tqdm(range(len(dst_train))):
-        sample = dst_train[i]
-        # [1,3,32,32]
-        images_all.append(torch.unsqueeze(sample[0], dim=0))
-        # class num
-        labels_all.append(class_map[torch.tensor(sample[1]).item()])
-    for i, lab in tqdm(enumerate(labels_all)):
-        indices_class[lab].append(i)
-    images_all = torch.cat(images_all, dim=0).to("cpu")
-    labels_all = torch.tensor(labels_all, dtype=torch.long, device="cpu")
+    loader_build = torch.utils.data.DataLoader(
+        dst_train,
+        batch_size=512,
+        shuffle=False,
+        num_workers=args.num_workers or 4,
+    )
+    images_all = torch.empty(
+        (len(dst_train), channel, im_size[0], im_size[1]), dtype=torch.float
+    )
+    labels_all = torch.empty(len(dst_train), dtype=torch.long)
+    off = 0
+    for x, y in tqdm(loader_build):
+        b = x.shape[0]
+        images_all[off : off + b].copy_(x)
+        labels_all[off : off + b] = class_map_tensor[torch.as_tensor(y, dtype=torch.long)]
+        off += b
+    del loader_build
+
+    indices_class = get_class_indices(labels_all, num_classes)
 
     def get_images(c, n):  # get random n images from class c
-        idx_shuffle = np.random.permutation(indices_class[c])[:n]
-        return images_all[idx_shuffle]
+        idx_shuffle = indices_class[c][torch.randperm(indices_class[c].numel())[:n]]
+        # gather into a small page-locked batch so the copy to device can be async
+        out = torch.empty(
+            (len(idx_shuffle),) + images_all.shape[1:],
+            dtype=images_all.dtype,
+            pin_memory=torch.cuda.is_available(),
+        )
+        return torch.index_select(images_all, 0, idx_shuffle, out=out)
 
     ''' initialize the synthetic data '''
-    label_syn = torch.tensor(
-        [np.ones(args.ipc, dtype=np.int_) * i for i in range(num_classes)],
-        dtype=torch.long,
-        requires_grad=False,
-        device=args.device,
-    ).view(
-        -1
+    label_syn = torch.arange(num_classes, device=args.device).repeat_interleave(
+        args.ipc
     )  # [0,0,0, 1,1,1, ..., 9,9,9]
 
 
     image_syn = torch.randn(
         size=(num_classes * args.ipc, channel, im_size[0], im_size[1]),
         dtype=torch.float,
+        device=args.device,
     )
 
     syn_lr = torch.tensor(args.lr_teacher).to(args.device)
@@ -133,8 +208,8 @@ def main(args):
     if args.pix_init == 'real':
         print('initialize synthetic data from random real images')
         for c in range(num_classes):
-            image_syn.data[c * args.ipc : (c + 1) * args.ipc] = (
-                get_images(c, args.ipc).detach().data
+            image_syn.data[c * args.ipc : (c + 1) * args.ipc].copy_(
+                get_images(c, args.ipc).to(args.device, non_blocking=True)
             )
     else:
         print('initialize synthetic data from random noise')
@@ -142,11 +217,55 @@ def main(args):
     ''' training '''
     image_syn = image_syn.detach().to(args.device).requires_grad_(True)
     syn_lr = syn_lr.detach().to(args.device).requires_grad_(True)
-    optimizer_img = torch.optim.SGD([image_syn], lr=args.lr_img, momentum=0.5)
-    optimizer_lr = torch.optim.SGD([syn_lr], lr=args.lr_lr, momentum=0.5)
-    optimizer_img.zero_grad()
+    if args.distributed:
+        # ranks share seeds, so expert sampling and batch permutations stay in lockstep
+        dist.broadcast(image_syn.data, 0)
+    # the fused kernels are CUDA-only and older PyTorch releases lack the argument
+    sgd_kwargs = {}
+    if image_syn.is_cuda and 'fused' in inspect.signature(torch.optim.SGD).parameters:
+        sgd_kwargs['fused'] = True
+    optimizer_img = torch.optim.SGD(
+        [image_syn], lr=args.lr_img, momentum=0.5, **sgd_kwargs
+    )
+    optimizer_lr = torch.optim.SGD(
+        [syn_lr], lr=args.lr_lr, momentum=0.5, **sgd_kwargs
+    )
+    optimizer_img.zero_grad(set_to_none=True)
 
     criterion = nn.CrossEntropyLoss().to(args.device)
+    grand_loss_fn = (
+        torch.compile(compute_grand_loss) if args.compile else compute_grand_loss
+    )
+    # the augmentation only sits on the first-order path to image_syn, so unlike the
+    # student it can be compiled; its fixed chain of small kernels gets fused
+    diff_augment = torch.compile(DiffAugment) if args.compile else DiffAugment
+
+    # the student's weights always come from flat_param, so one network is reused
+    # across iterations instead of being re-allocated every time
+    student_net = get_network(
+        args.model, channel, num_classes, im_size, dist=False,args=args
+    ).to(
+        args.device
+    )  # get a random model
+
+    student_net = ReparamModule(student_net)
+
+    student_net.train()
+
+    num_params = sum(p.numel() for p in student_net.parameters())
+
+    def step_grad(params, x, y):
+        # functional gradient of the student's loss w.r.t. its flat parameters; the
+        # result stays differentiable w.r.t. params, x and y for the outer loss
+        if func_grad is None:
+            # PyTorch < 2.0 has no torch.func; take the same gradient with create_graph
+            ce_loss = criterion(student_net(x, flat_param=params), y)
+            return torch.autograd.grad(ce_loss, params, create_graph=True)[0]
+        return func_grad(lambda p: criterion(student_net(x, flat_param=p), y))(params)
+
+    indices_generator = torch.Generator(device=args.device)
+    indices_generator.manual_seed(torch.initial_seed())
+
     print('%s training begins' % get_time())
     expert_dir = os.path.join(args.buffer_path, args.dataset)
     if args.dataset == "ImageNet":
@@ -156,28 +275,52 @@ def main(args):
     expert_dir = os.path.join(expert_dir, args.model)
     print("Expert Dir: {}".format(expert_dir))
 
+    buffer_name = "replay_buffer_{}.bf16.pt" if args.bf16_buffer else "replay_buffer_{}.pt"
+    expert_files = []
+    n = 0
+    while os.path.exists(os.path.join(expert_dir, buffer_name.format(n))):
+        expert_files.append(
+            os.path.join(expert_dir, buffer_name.format(n))
+        )
+        n += 1
+    if n == 0:
+        raise AssertionError("No buffers detected at {}".format(expert_dir))
+
+    def load_expert_buffer(path):
+        # one contiguous (pinned) [epochs, num_params] tensor per expert trajectory
+        return [
+            flatten_trajectory(trajectory, pin_memory=torch.cuda.is_available())
+            for trajectory in load_buffer(path)
+        ]
+
     if args.load_all:
+        # trajectories stay memory-mapped; only the checkpoints used each iteration
+        # are materialised
         print('load all buffer')
         buffer = []
-        n = 0
-        while os.path.exists(os.path.join(expert_dir, "replay_buffer_{}.pt".format(n))):
-            print(f"load buffer:replay_buffer_{n}.pt")
-            buffer = buffer + torch.load(
-                os.path.join(expert_dir, "replay_buffer_{}.pt".format(n))
-            )
-            n += 1
-        if n == 0:
-            raise AssertionError("No buffers detected at {}".format(expert_dir))
+        with ThreadPoolExecutor(max_workers=min(8, n)) as pool:
+            for expert_file, file_buffer in zip(
+                expert_files,
+                pool.map(lambda f: load_buffer(f, sequential=False), expert_files),
+            ):
+                print(f"load buffer:{os.path.basename(expert_file)}")
+                buffer.extend(file_buffer)
     else:
-        expert_files = []
-        n = 0
-        while os.path.exists(os.path.join(expert_dir, "replay_buffer_{}.pt".format(n))):
-            expert_files.append(
-                os.path.join(expert_dir, "replalry_buffer_{}.pt".format(n))
+        buffer_pool = ThreadPoolExecutor(max_workers=2)
+
+        def prefetch_buffer(file_idx):
+            # start loading the file that follows file_idx, reshuffling on wrap-around
+            if len(expert_files) == 1:
+                # the only file is already in memory and is reused as it is
+                return 0, None
+            next_idx = file_idx + 1
+            if next_idx == len(expert_files):
+                next_idx = 0
+                random.shuffle(expert_files)
+            return next_idx, buffer_pool.submit(
+                load_expert_buffer, expert_files[next_idx]
             )
-            n += 1
-        if n == 0:
-            raise AssertionError("No buffers detected at {}".format(expert_dir))
+
         file_idx = 0
         expert_idx = 0
         random.shuffle(expert_files)
@@ -185,10 +328,51 @@ def main(args):
             expert_files = expert_files[: args.max_files]
 
         print("loading file {}".format(expert_files[file_idx]))
-        buffer = torch.load(expert_files[file_idx])
+        buffer = load_expert_buffer(expert_files[file_idx])
         if args.max_experts is not None:
             buffer = buffer[: args.max_experts]
         random.shuffle(buffer)
+        next_file_idx, next_buffer = prefetch_buffer(file_idx)
+
+    copy_stream = torch.cuda.Stream() if torch.cuda.is_available() else None
+
+    def stage_expert_params():
+        # pick the next expert segment and queue its host-to-device copy on copy_stream,
+        # so that it overlaps with the compute of the iteration in flight
+        nonlocal buffer, expert_idx, file_idx, next_file_idx, next_buffer
+        if args.load_all:
+            expert_trajectory = buffer[np.random.randint(0, len(buffer))]
+        else:
+            expert_trajectory = buffer[expert_idx]
+            expert_idx += 1
+            if expert_idx == len(buffer):
+                expert_idx = 0
+                file_idx = next_file_idx
+                print("loading file {}".format(expert_files[file_idx]))
+                if next_buffer is not None:
+                    del buffer
+                    buffer = next_buffer.result()
+                if args.max_experts is not None:
+                    buffer = buffer[: args.max_experts]
+                random.shuffle(buffer)
+                next_file_idx, next_buffer = prefetch_buffer(file_idx)
+        start_epoch = np.random.randint(0, args.max_start_epoch)
+        target_epoch = start_epoch + args.expert_epochs
+        if args.load_all:
+            starting_params, target_params = flatten_trajectory(
+                [expert_trajectory[start_epoch], expert_trajectory[target_epoch]],
+                pin_memory=torch.cuda.is_available(),
+            )
+        else:
+            starting_params = expert_trajectory[start_epoch]
+            target_params = expert_trajectory[target_epoch]
+        # bf16 buffers are copied at half size and up-cast to fp32 on the device
+        with torch.cuda.stream(copy_stream):
+            starting_params = starting_params.to(args.device, non_blocking=True).float()
+            target_params = target_params.to(args.device, non_blocking=True).float()
+        return starting_params, target_params
+
+    next_expert_params = stage_expert_params()
 
     best_acc = {m: 0 for m in model_eval_pool}
 
@@ -196,8 +380,16 @@ def main(args):
 
     for it in range(0, args.Iteration + 1):
         save_best_it = False
-        
-        if it in eval_it_pool and it>0:  
+
+        if args.distributed and it in eval_it_pool and it > 0:
+            # evaluation only runs on rank 0 and must not advance the shared RNG streams
+            rng_states = (
+                random.getstate(),
+                np.random.get_state(),
+                torch.get_rng_state(),
+                torch.cuda.get_rng_state(),
+            )
+        if it in eval_it_pool and it>0 and args.rank == 0:
             for model_eval in model_eval_pool:
                 print(
                     '-------------------------\nEvaluation\nmodel_train = %s, model_eval = %s, iteration = %d'
@@ -212,19 +404,22 @@ def main(args):
                 accs_test = []
                 accs_train = []
                 for it_eval in range(args.num_eval):
+                    # under torchrun the other GPUs belong to ranks waiting in a
+                    # collective, so rank 0 evaluates on its own device only
                     net_eval = get_network(
-                        model_eval, channel, num_classes, im_size, args=args
+                        model_eval,
+                        channel,
+                        num_classes,
+                        im_size,
+                        dist=not args.distributed,
+                        args=args,
                     ).to(
                         args.device
                     )  # get a random model
 
-                    eval_labs = label_syn
-                    with torch.no_grad():
-                        image_save = image_syn
-                    image_syn_eval, label_syn_eval = copy.deepcopy(
-                        image_save.detach()
-                    ), copy.deepcopy(
-                        eval_labs.detach()
+                    image_syn_eval, label_syn_eval = (
+                        image_syn.detach().clone(),
+                        label_syn.detach().clone(),
                     )  # avoid any unaware modification
 
                     args.lr_net = syn_lr.item()
@@ -254,7 +449,7 @@ def main(args):
 
         if it in eval_it_pool and (
             save_best_it or it % args.save_it == 0
-        ) and it > 0:
+        ) and it > 0 and args.rank == 0:
             with torch.no_grad():
                 image_save = image_syn.cuda()
                 save_dir = os.path.join(
@@ -283,117 +478,92 @@ def main(args):
                     torch.save(
                         label_syn.cpu(), os.path.join(save_dir, "labels_{}.pt".format(it))
                     )
-        student_net = get_network(
-            args.model, channel, num_classes, im_size, dist=False,args=args
-        ).to(
-            args.device
-        )  # get a random model
-
-        student_net = ReparamModule(student_net)
-
-        if args.distributed:
-            student_net = torch.nn.DataParallel(student_net)
-
-        student_net.train()
-
-        num_params = sum([np.prod(p.size()) for p in (student_net.parameters())])
-
-        if args.load_all:
-            expert_trajectory = buffer[np.random.randint(0, len(buffer))]
-        else:
-            expert_trajectory = buffer[expert_idx]
-            expert_idx += 1
-            if expert_idx == len(buffer):
-                expert_idx = 0
-                file_idx += 1
-                if file_idx == len(expert_files):
-                    file_idx = 0
-                    random.shuffle(expert_files)
-                print("loading file {}".format(expert_files[file_idx]))
-                if args.max_files != 1:
-                    del buffer
-                    buffer = torch.load(expert_files[file_idx])
-                if args.max_experts is not None:
-                    buffer = buffer[: args.max_experts]
-                random.shuffle(buffer)
-        start_epoch = np.random.randint(0, args.max_start_epoch)
-        starting_params = expert_trajectory[start_epoch]
-        target_params = expert_trajectory[start_epoch + args.expert_epochs]
-        target_params = torch.cat(
-            [p.data.to(args.device).reshape(-1) for p in target_params], 0
-        )
-        student_params = [
-            torch.cat(
-                [p.data.to(args.device).reshape(-1) for p in starting_params], 0
-            ).requires_grad_(True)
-        ]
-
-        starting_params = torch.cat(
-            [p.data.to(args.device).reshape(-1) for p in starting_params], 0
-        )
+        if args.distributed and it in eval_it_pool and it > 0:
+            random.setstate(rng_states[0])
+            np.random.set_state(rng_states[1])
+            torch.set_rng_state(rng_states[2])
+            torch.cuda.set_rng_state(rng_states[3])
+
+        starting_params, target_params = next_expert_params
+        if copy_stream is not None:
+            torch.cuda.current_stream().wait_stream(copy_stream)
+            starting_params.record_stream(torch.cuda.current_stream())
+            target_params.record_stream(torch.cuda.current_stream())
+        next_expert_params = stage_expert_params()
+        student_params = [starting_params.clone().requires_grad_(True)]
+        # constant for the whole iteration, so it is computed once here
+        param_dist = torch.nn.functional.mse_loss(
+            starting_params, target_params, reduction="sum"
+        ).detach()
 
         syn_images = image_syn
-        y_hat = label_syn.to(args.device)
+        y_hat = label_syn
 
-        param_loss_list = []
-        param_dist_list = []
         indices_chunks = []
-        for step in range(args.syn_steps):
-            if not indices_chunks:
-                indices = torch.randperm(len(syn_images))
-                indices_chunks = list(torch.split(indices, args.batch_syn))
-            these_indices = indices_chunks.pop()
-            x = syn_images[these_indices]
-            this_y = y_hat[these_indices]
-            if args.dsa and (not args.no_aug):
-                x = DiffAugment(x, args.dsa_strategy, param=args.dsa_param)
-
-            if args.distributed:
-                forward_params = (
-                    student_params[-1].unsqueeze(0).expand(torch.cuda.device_count(), -1)
-                )
-            else:
-                forward_params = student_params[-1]
-            
-            x = student_net(x, flat_param=forward_params)
-        
-            ce_loss = criterion(x, this_y)
-            grad = torch.autograd.grad(ce_loss, student_params[-1], create_graph=True)[
-                0
-            ]
-            student_params.append(student_params[-1] - syn_lr * grad)
-        param_loss = torch.tensor(0.0).to(args.device)
-        param_dist = torch.tensor(0.0).to(args.device)
-        param_loss += torch.nn.functional.mse_loss(
-            student_params[-1], target_params, reduction="sum"
-        )
-        param_dist += torch.nn.functional.mse_loss(
-            starting_params, target_params, reduction="sum"
+        # the student forward/backward run in bf16; parameters and updates stay fp32
+        with torch.autocast(
+            device_type='cuda', dtype=torch.bfloat16, enabled=args.bf16_autocast
+        ):
+            for step in range(args.syn_steps):
+                if not indices_chunks:
+                    indices = torch.randperm(
+                        len(syn_images), device=args.device, generator=indices_generator
+                    )
+                    indices_chunks = list(indices.split(args.batch_syn))
+                these_indices = indices_chunks.pop()
+                x = syn_images.index_select(0, these_indices)
+                this_y = y_hat.index_select(0, these_indices)
+                if args.dsa and (not args.no_aug):
+                    x = diff_augment(x, args.dsa_strategy, param=args.dsa_param)
+
+                if args.distributed:
+                    # every rank augments the same full batch with per-sample parameters
+                    # and then works on its own slice of it
+                    x = x.tensor_split(args.world_size)[args.rank]
+                    this_y = this_y.tensor_split(args.world_size)[args.rank]
+                    params = _SharedAcrossRanks.apply(student_params[-1])
+                    if len(x) > 0:
+                        # weight the slice's mean loss so the sum is the full-batch mean
+                        grad = step_grad(params, x, this_y) * (
+                            len(x) / len(these_indices)
+                        )
+                    else:
+                        grad = params * 0
+                    grad = _SumAcrossRanks.apply(grad)
+                else:
+                    grad = step_grad(student_params[-1], x, this_y)
+                student_params.append(student_params[-1] - syn_lr * grad)
+        grand_loss = grand_loss_fn(
+            student_params[-1].float(), target_params, param_dist, num_params
         )
 
-        param_loss_list.append(param_loss)
-        param_dist_list.append(param_dist)
-
-        param_loss /= num_params
-        param_dist /= num_params
-
-        param_loss /= param_dist
-
-        grand_loss = param_loss
-
-        optimizer_img.zero_grad()
-        optimizer_lr.zero_grad()
+        optimizer_img.zero_grad(set_to_none=True)
+        optimizer_lr.zero_grad(set_to_none=True)
         grand_loss.backward()
 
+        if args.distributed:
+            # each rank only holds the image gradients of its own batch slices;
+            # syn_lr only enters through the replicated update, so its gradient is complete
+            if image_syn.grad is None:
+                # this rank's slices were all empty (batch_syn < world_size)
+                image_syn.grad = torch.zeros_like(image_syn)
+            dist.all_reduce(image_syn.grad)
+
         optimizer_img.step()
         optimizer_lr.step()
 
 
-        for _ in student_params:
-            del _
-
-        if it % 10 == 0:
+        if it % 10 == 0 and args.rank == 0:
             print('%s iter = %04d, loss = %.4f' % (get_time(), it, grand_loss.item()))
+
+        # release the unrolled student parameters and the loss graph now rather than
+        # when the names are rebound next iteration (after evaluation / buffer loads)
+        student_params.clear()
+        grand_loss = None
+        grad = None
+
+    if args.distributed:
+        dist.destroy_process_group()
                 
 
 
@@ -527,6 +697,12 @@ if __name__ == '__main__':
         help="only use if you can fit all expert trajectories into RAM",
     )
 
+    parser.add_argument(
+        '--bf16_buffer',
+        action='store_true',
+        help="read the replay_buffer_*.bf16.pt files written by convert_buffer.py",
+    )
+
     parser.add_argument(
         '--no_aug',
         type=bool,
@@ -568,6 +744,23 @@ if __name__ == '__main__':
         help='gpus use for training',
     )
     parser.add_argument('--num_workers', type=int, default=0, help='num workers')
+    parser.add_argument(
+        '--bf16_autocast',
+        action='store_true',
+        help='run the syn_steps inner loop under bf16 autocast (CUDA only)',
+    )
+    parser.add_argument(
+        '--dist_timeout',
+        type=float,
+        default=240,
+        help='minutes ranks may wait in a collective under torchrun; must cover one '
+        'evaluation round on rank 0',
+    )
+    parser.add_argument(
+        '--compile',
+        action='store_true',
+        help='use torch.compile for the fusable parts of the distillation step',
+    )
 
     args = parser.parse_args()
 
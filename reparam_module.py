@@ -147,9 +147,12 @@ class ReparamModule(nn.Module):
             return self.module(*inputs, **kwinputs)
 
     def forward(self, *inputs, flat_param=None, buffers=None,width_mult=None, **kwinputs):
-        flat_param = torch.squeeze(flat_param)
         if flat_param is None:
             flat_param = self.flat_param
+        elif flat_param.dim() > 1:
+            # DataParallel replicas get a [1, numel] slice of the expanded params; a flat
+            # vector is used as is so no extra view is recorded in the autograd graph
+            flat_param = torch.squeeze(flat_param)
         if buffers is not None:
             return self._forward_with_param_and_buffers(flat_param, tuple(buffers), *inputs, **kwinputs)
         elif width_mult is not None:
@@ -8,6 +8,9 @@ import torch.nn as nn
 import torch.nn.functional as F
 import os
 import sys
+import mmap
+import inspect
+import ctypes
 import kornia as K
 import torch.optim as optim
 import tqdm
@@ -1596,6 +1599,67 @@ AUGMENT_FNS = {
 }
 
 
+def get_class_indices(labels, num_classes):
+    # bucket sample indices by class: sorted order split at the per-class counts
+    order = torch.argsort(labels, stable=True)
+    counts = torch.bincount(labels, minlength=num_classes)
+    return list(torch.split(order, counts.tolist()))
+
+
+def _iter_tensors(obj):
+    if isinstance(obj, torch.Tensor):
+        yield obj
+    else:
+        for o in obj:
+            yield from _iter_tensors(o)
+
+
+def _madvise(tensors, advice):
+    # all storages of an mmap-ed checkpoint live in one mapping, so advise its whole span
+    storages = [t.untyped_storage() for t in tensors]
+    if not storages:
+        return
+    start = min(s.data_ptr() for s in storages)
+    end = max(s.data_ptr() + s.nbytes() for s in storages)
+    start -= start % mmap.PAGESIZE
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.madvise(ctypes.c_void_p(start), ctypes.c_size_t(end - start), advice)
+
+
+def load_buffer(path, sequential=True):
+    # ask the kernel to start reading the file into page cache, then map it lazily
+    if hasattr(os, 'posix_fadvise'):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    if 'mmap' not in inspect.signature(torch.load).parameters:
+        # PyTorch < 2.1 cannot map checkpoints, so read the whole file eagerly
+        return torch.load(path, map_location='cpu', weights_only=True)
+    buffer = torch.load(path, map_location='cpu', mmap=True, weights_only=True)
+    if sequential and hasattr(mmap, 'MADV_SEQUENTIAL'):
+        _madvise(list(_iter_tensors(buffer)), mmap.MADV_SEQUENTIAL)
+    return buffer
+
+
+def flatten_trajectory(trajectory, pin_memory=False):
+    # stack every checkpoint of an expert trajectory into one [epochs, num_params] tensor;
+    # a checkpoint is either a list of parameters or an already-flat vector
+    checkpoints = [
+        [params] if isinstance(params, torch.Tensor) else params
+        for params in trajectory
+    ]
+    flat = torch.empty(
+        (len(checkpoints), sum(p.numel() for p in checkpoints[0])),
+        dtype=checkpoints[0][0].dtype,
+        pin_memory=pin_memory,
+    )
+    for flat_params, params in zip(flat, checkpoints):
+        torch.cat([p.reshape(-1) for p in params], 0, out=flat_params)
+    return flat
+
+
 
 def seed_torch(seed=3407):    
 	random.seed(seed)
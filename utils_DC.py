@@ -119,6 +119,14 @@ class TensorDataset(Dataset):
 
 
 
+def get_class_indices(labels, num_classes):
+    # bucket sample indices by class: sorted order split at the per-class counts
+    order = torch.argsort(labels, stable=True)
+    counts = torch.bincount(labels, minlength=num_classes)
+    return list(torch.split(order, counts.tolist()))
+
+
+
 def get_default_convnet_setting():
     net_width, net_depth, net_act, net_norm, net_pooling = 128, 3, 'relu', 'instancenorm', 'avgpooling'
     return net_width, net_depth, net_act, net_norm, net_pooling